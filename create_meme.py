@@ -7,31 +7,364 @@ This function creates a professional 1×4 layout showing:
 - Estimate (masked stippled image)
 """
 
+import multiprocessing
+import os
+from concurrent.futures import Future, ProcessPoolExecutor
 import numpy as np
-import matplotlib.pyplot as plt
+from typing import Optional
+from matplotlib.colors import to_rgb
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 from matplotlib.gridspec import GridSpec
+from PIL import Image, ImageDraw, ImageFont
+from step4_create_block_letter import _find_font_path, _get_font
+
+
+# Panel labels, in left-to-right order
+_PANEL_LABELS = ("Reality", "Your Model", "Selection Bias", "Estimate")
+
+# Argument names of the panels, used in error messages
+_PANEL_NAMES = ("original", "stipple", "block_letter", "masked_stipple")
+
+# Label font size in points (converted to pixels using dpi)
+_LABEL_FONT_SIZE = 18
+
+# PNG encoder settings: the meme is flat grayscale, so heavy zlib
+# compression costs far more time than it saves in bytes
+_PNG_SAVE_KWARGS = {"optimize": False, "compress_level": 1}
+
+# Set MEME_SYNC_SAVE=1 to make async_save run synchronously (for debugging)
+_SYNC_SAVE = os.environ.get("MEME_SYNC_SAVE", "") not in ("", "0")
+
+# Process pool for async_save, created on first use
+_SAVE_EXECUTOR: Optional[ProcessPoolExecutor] = None
+
+
+def _load_label_font(font_px: int):
+    """
+    Load a bold font for the panel labels, falling back to PIL's default font.
+    """
+    font_path = _find_font_path()
+    if font_path:
+        try:
+            return _get_font(font_path, font_px)
+        except (OSError, IOError):
+            pass
+    try:
+        # Pillow >= 10.1 can scale the default font
+        return ImageFont.load_default(size=font_px)
+    except TypeError:
+        return ImageFont.load_default()
+
+
+def _panel_to_uint8(panel: np.ndarray) -> np.ndarray:
+    """
+    Convert a panel to uint8 in [0, 255].
+    
+    Float panels are expected in [0, 1] and values outside are clipped (as
+    imshow with vmin=0, vmax=1 does); uint8 panels are returned unchanged
+    and boolean panels map True to white.
+    """
+    if panel.dtype == np.uint8:
+        return panel
+    if panel.dtype == np.bool_:
+        return panel.view(np.uint8) * np.uint8(255)
+    scaled = panel * np.float32(255)
+    np.clip(scaled, 0, 255, out=scaled)
+    return scaled.astype(np.uint8)
+
+
+def _save_meme_pillow(
+    panels_u8: np.ndarray,
+    output_path: str,
+    dpi: int,
+    background_color: str
+) -> None:
+    """
+    Assemble the panels directly on a uint8 canvas and encode it with Pillow.
+    
+    The panels (a uint8 stack of shape (4, height, width)) are copied at their
+    native resolution into a single canvas with a label band on top, so no
+    figure, axes or double rendering pass is needed.
+    """
+    height, width = panels_u8.shape[1:]
+    font_px = max(1, round(_LABEL_FONT_SIZE * dpi / 72))
+    font = _load_label_font(font_px)
+    
+    # Shrink the labels if the widest one would overflow its panel
+    widest = max(font.getlength(label) for label in _PANEL_LABELS)
+    if widest > 0.95 * width:
+        font_px = max(1, int(font_px * 0.95 * width / widest))
+        font = _load_label_font(font_px)
+    label_h = 2 * font_px
+    gap = max(1, round(0.1 * dpi))
+    
+    # Grayscale backgrounds fit in a single channel; colors need RGB
+    rgb = tuple(round(c * 255) for c in to_rgb(background_color))
+    if rgb[0] == rgb[1] == rgb[2]:
+        canvas = np.empty((height + label_h + gap, 4 * width + 5 * gap), dtype=np.uint8)
+        canvas.fill(rgb[0])
+        mode, text_fill = 'L', 0
+    else:
+        canvas = np.empty((height + label_h + gap, 4 * width + 5 * gap, 3), dtype=np.uint8)
+        canvas[...] = rgb
+        mode, text_fill = 'RGB', (0, 0, 0)
+    
+    # Copy each panel into its slot below the label band
+    for i, panel_u8 in enumerate(panels_u8):
+        x0 = gap + i * (width + gap)
+        slot = canvas[label_h:label_h + height, x0:x0 + width]
+        if mode == 'RGB':
+            panel_u8 = panel_u8[:, :, None]
+        np.copyto(slot, panel_u8)
+    
+    # Draw the labels centered above each panel
+    img = Image.fromarray(canvas)
+    draw = ImageDraw.Draw(img)
+    for i, label in enumerate(_PANEL_LABELS):
+        x_center = gap + i * (width + gap) + width / 2
+        draw.text((x_center, label_h / 2), label, fill=text_fill, font=font, anchor='mm')
+    
+    img.save(output_path, dpi=(dpi, dpi), **_PNG_SAVE_KWARGS)
+
+
+def _build_meme_figure(
+    panels_u8: np.ndarray,
+    dpi: int,
+    background_color: str
+) -> tuple:
+    """
+    Build the 1×4 matplotlib figure for a uint8 panel stack (4, height, width).
+    
+    Returns
+    -------
+    fig, images : tuple
+        The figure and the list of its four AxesImage artists.
+    """
+    # Create figure with 1×4 layout
+    # GridSpec fixes the margins up front (top leaves room for the labels),
+    # so savefig can render once without bbox_inches='tight'
+    # The figure is attached to an Agg canvas directly, bypassing pyplot's
+    # figure manager (and any interactive backend the caller has selected)
+    fig = Figure(figsize=(16, 4.5), facecolor=background_color, dpi=dpi)
+    FigureCanvasAgg(fig)
+    gs = GridSpec(1, 4, figure=fig, hspace=0.1, wspace=0.03,
+                  left=0.02, right=0.98, top=0.85, bottom=0.05)
+    
+    # Create subplots for each panel
+    images = []
+    for i in range(4):
+        ax = fig.add_subplot(gs[0, i])
+        images.append(ax.imshow(panels_u8[i], cmap='gray', vmin=0, vmax=255, aspect='auto'))
+        ax.axis('off')
+        
+        # Add label above each panel in figure coordinates
+        pos = ax.get_position()
+        fig.text((pos.x0 + pos.x1) / 2, pos.y1 + 0.03, _PANEL_LABELS[i],
+                 fontsize=_LABEL_FONT_SIZE,
+                 fontweight='bold',
+                 ha='center',
+                 va='bottom',
+                 color='black')
+    
+    return fig, images
+
+
+class _MemeFigureCache:
+    """
+    A single meme figure kept alive between create_statistics_meme calls.
+    
+    Building the figure and its four axes dominates the matplotlib path, so
+    later calls only swap the image data. The figure is rebuilt when dpi or
+    background_color change.
+    """
+    
+    def __init__(self):
+        self.fig = None
+        self.images = None
+        self.key = None
+    
+    def get(self, panels_u8: np.ndarray, dpi: int, background_color: str):
+        """
+        Return the cached figure showing panels_u8, building it if needed.
+        """
+        key = (dpi, background_color)
+        if self.fig is None or self.key != key:
+            self.close()
+            self.fig, self.images = _build_meme_figure(panels_u8, dpi, background_color)
+            self.key = key
+            return self.fig
+        
+        for image, panel_u8 in zip(self.images, panels_u8):
+            image.set_data(panel_u8)
+        return self.fig
+    
+    def close(self):
+        """
+        Release the cached figure, if any.
+        """
+        self.fig = None
+        self.images = None
+        self.key = None
+
+
+_FIGURE_CACHE = _MemeFigureCache()
+
+
+def _save_meme_matplotlib(
+    panels_u8: np.ndarray,
+    output_path: str,
+    dpi: int,
+    background_color: str,
+    reuse_figure: bool = False
+) -> None:
+    """
+    Assemble the panels with a matplotlib figure and save it with Pillow.
+    """
+    if reuse_figure:
+        fig = _FIGURE_CACHE.get(panels_u8, dpi, background_color)
+    else:
+        fig, _ = _build_meme_figure(panels_u8, dpi, background_color)
+    
+    # Render once on the Agg canvas and encode the buffer with Pillow instead
+    # of savefig's RGBA PNG writer
+    fig.canvas.draw()
+    rgba = np.asarray(fig.canvas.buffer_rgba())
+    
+    # Gray colormap, black labels and a gray background give R == G == B,
+    # so one channel holds the whole image
+    r, g, b = to_rgb(background_color)
+    if r == g == b:
+        img = Image.fromarray(np.ascontiguousarray(rgba[:, :, 0]))
+    else:
+        img = Image.fromarray(np.ascontiguousarray(rgba[:, :, :3]))
+    img.save(output_path, dpi=(dpi, dpi), **_PNG_SAVE_KWARGS)
+
+
+def _render_and_save(
+    panels_u8: np.ndarray,
+    output_path: str,
+    dpi: int,
+    background_color: str,
+    use_matplotlib: bool,
+    reuse_figure: bool = False
+) -> None:
+    """
+    Render the meme and write it to output_path.
+    
+    Module-level so it can be pickled and run in a worker process.
+    """
+    if use_matplotlib:
+        _save_meme_matplotlib(panels_u8, output_path, dpi, background_color, reuse_figure)
+    else:
+        _save_meme_pillow(panels_u8, output_path, dpi, background_color)
+    
+    # print(f"Statistics meme saved to: {output_path}")
+
+
+def _get_save_executor() -> ProcessPoolExecutor:
+    """
+    Return the process pool used by async_save, creating it on first use.
+    """
+    global _SAVE_EXECUTOR
+    if _SAVE_EXECUTOR is None:
+        # Spawn rather than fork: forking after the parallel Numba kernels
+        # have started their thread pool hangs the process at exit
+        _SAVE_EXECUTOR = ProcessPoolExecutor(mp_context=multiprocessing.get_context("spawn"))
+    return _SAVE_EXECUTOR
+
+
+def create_statistics_meme_from_panels(
+    panels: np.ndarray,
+    output_path: str,
+    dpi: int = 150,
+    background_color: str = "white",
+    use_matplotlib: bool = False,
+    async_save: bool = False,
+    reuse_figure: bool = False
+) -> Optional[Future]:
+    """
+    Create the four-panel statistics meme from a stacked panel array.
+    
+    Parameters
+    ----------
+    panels : np.ndarray
+        Panels stacked as a 3D array (4, height, width) in display order
+        (Reality, Your Model, Selection Bias, Estimate). Float values in
+        [0, 1] (float32 preferred), uint8 values in [0, 255] or booleans
+        (True = white).
+        The whole stack is converted to uint8 in a single vectorized pass.
+    output_path, dpi, background_color, use_matplotlib, async_save, reuse_figure
+        See create_statistics_meme.
+    
+    Returns
+    -------
+    future : Optional[Future]
+        None, or a Future when async_save=True (see create_statistics_meme).
+    
+    Raises
+    ------
+    ValueError
+        If panels does not have shape (4, height, width).
+    """
+    if panels.ndim != 3 or panels.shape[0] != 4:
+        raise ValueError(
+            f"panels must have shape (4, height, width), got {panels.shape}"
+        )
+    
+    panels_u8 = np.ascontiguousarray(_panel_to_uint8(panels))
+    
+    if not async_save:
+        _render_and_save(panels_u8, output_path, dpi, background_color, use_matplotlib,
+                         reuse_figure)
+        return None
+    
+    if _SYNC_SAVE:
+        future = Future()
+        try:
+            _render_and_save(panels_u8, output_path, dpi, background_color, use_matplotlib,
+                             reuse_figure)
+            future.set_result(None)
+        except Exception as exc:
+            future.set_exception(exc)
+        return future
+    
+    return _get_save_executor().submit(
+        _render_and_save, panels_u8, output_path, dpi, background_color, use_matplotlib,
+        reuse_figure
+    )
 
 
 def create_statistics_meme(
     original_img: np.ndarray,
     stipple_img: np.ndarray,
-    block_letter_img: np.ndarray,
+    block_letter_img: Optional[np.ndarray],
     masked_stipple_img: np.ndarray,
     output_path: str,
     dpi: int = 150,
-    background_color: str = "white"
-) -> None:
+    background_color: str = "white",
+    use_matplotlib: bool = False,
+    precomputed_mask_bool: Optional[np.ndarray] = None,
+    async_save: bool = False,
+    reuse_figure: bool = False
+) -> Optional[Future]:
     """
     Create a professional four-panel statistics meme demonstrating selection bias.
     
+    The panels are stacked and passed to create_statistics_meme_from_panels.
+    Besides floats in [0, 1], any of the four panels may also be given as
+    uint8 in [0, 255] or as a boolean array (True = white), as returned by
+    create_block_letter_s.
+    
     Parameters
     ----------
     original_img : np.ndarray
         Original grayscale image (Reality panel) as 2D array (height, width) with values in [0, 1]
     stipple_img : np.ndarray
         Stippled image (Your Model panel) as 2D array (height, width) with values in [0, 1]
-    block_letter_img : np.ndarray
+    block_letter_img : Optional[np.ndarray]
         Block letter image (Selection Bias panel) as 2D array (height, width) with values in [0, 1]
+        May be None when precomputed_mask_bool is given.
     masked_stipple_img : np.ndarray
         Masked stippled image (Estimate panel) as 2D array (height, width) with values in [0, 1]
     output_path : str
@@ -39,69 +372,80 @@ def create_statistics_meme(
     dpi : int
         Resolution in dots per inch for the output image. Default 150.
         Higher values (200-300) produce better quality for publication.
+        With the default Pillow renderer, panels keep their native pixel size
+        and dpi only scales the labels and spacing.
     background_color : str
         Background color for the meme. Default "white".
         Can be any valid matplotlib color name (e.g., "pink", "lightgray", etc.)
+    use_matplotlib : bool
+        If True, render the meme with a matplotlib figure (16 × 4.5 inches)
+        instead of assembling the panels directly with Pillow. Default False.
+    precomputed_mask_bool : Optional[np.ndarray]
+        Boolean mask area (True = stipples removed), e.g. from
+        step5_create_masked._compute_mask_bool. If given, the Selection Bias
+        panel is drawn from it (mask area in black) instead of block_letter_img.
+    async_save : bool
+        If True, render and save the meme in a background process and return
+        immediately, so the next meme's panels can be computed meanwhile.
+        Matplotlib is not thread-safe, hence a process pool. Workers are
+        started with the "spawn" method, which re-imports the calling script,
+        so scripts using async_save must guard their entry point with
+        ``if __name__ == "__main__":``. Setting the MEME_SYNC_SAVE environment
+        variable forces synchronous saving. Default False.
+    reuse_figure : bool
+        If True (matplotlib path only), keep one figure alive and reuse it
+        across calls, updating only the panel data. Speeds up batch meme
+        generation; with async_save each worker process keeps its own figure.
+        Default False.
     
     Returns
     -------
-    None
-        The function saves the meme image to the specified output_path.
+    future : Optional[Future]
+        None by default; the function saves the meme image to the specified
+        output_path. With async_save=True, a Future that completes once the
+        file has been written (call .result() to wait and re-raise errors).
     
     Raises
     ------
     ValueError
-        If images have incompatible shapes (should all have the same shape).
+        If images have incompatible shapes (should all have the same shape),
+        or if neither block_letter_img nor precomputed_mask_bool is given.
     """
-    # Validate that all images have the same shape
-    img_shape = original_img.shape
-    images = {
-        "original": original_img,
-        "stipple": stipple_img,
-        "block_letter": block_letter_img,
-        "masked_stipple": masked_stipple_img
-    }
-    
-    for name, img in images.items():
-        if img.shape != img_shape:
-            raise ValueError(
-                f"All images must have the same shape. "
-                f"{name}_img shape: {img.shape}, expected: {img_shape}"
-            )
-    
-    # Panel labels
-    labels = ["Reality", "Your Model", "Selection Bias", "Estimate"]
-    panel_images = [original_img, stipple_img, block_letter_img, masked_stipple_img]
+    if precomputed_mask_bool is not None:
+        # Render the mask area black on white
+        block_letter_img = ~precomputed_mask_bool
+    elif block_letter_img is None:
+        raise ValueError("Either block_letter_img or precomputed_mask_bool must be given.")
     
-    # Create figure with 1×4 layout
-    # Use GridSpec for better control over spacing
-    fig = plt.figure(figsize=(16, 4.5), facecolor=background_color, dpi=dpi)
-    gs = GridSpec(1, 4, figure=fig, hspace=0.1, wspace=0.03, 
-                  left=0.02, right=0.98, top=0.88, bottom=0.1)
+    panel_images = (original_img, stipple_img, block_letter_img, masked_stipple_img)
     
-    # Create subplots for each panel
-    axes = []
-    for i in range(4):
-        ax = fig.add_subplot(gs[0, i])
-        ax.imshow(panel_images[i], cmap='gray', vmin=0, vmax=1, aspect='auto')
-        ax.axis('off')
-        
-        # Add label above each panel
-        # Position label slightly above the axes
-        ax.text(0.5, 1.08, labels[i], 
-                transform=ax.transAxes,
-                fontsize=18,
-                fontweight='bold',
-                ha='center',
-                va='bottom',
-                color='black')
-        
-        axes.append(ax)
+    # Validate that all images have the same shape
+    # (the error message is only built on the failure path)
+    img_shape = original_img.shape
+    if not (stipple_img.shape == img_shape == block_letter_img.shape == masked_stipple_img.shape):
+        mismatched = ", ".join(
+            f"{name}_img shape: {img.shape}"
+            for name, img in zip(_PANEL_NAMES, panel_images)
+            if img.shape != img_shape
+        )
+        raise ValueError(
+            f"All images must have the same shape. "
+            f"{mismatched}, expected: {img_shape}"
+        )
     
-    # Save the figure
-    plt.savefig(output_path, dpi=dpi, facecolor=background_color, 
-                bbox_inches='tight', pad_inches=0.1)
-    plt.close()
+    # Stack into one (4, height, width) array. Mixed dtypes (e.g. a uint8
+    # block letter next to float images) are converted to uint8 per panel.
+    dtypes = {img.dtype for img in panel_images}
+    if len(dtypes) == 1:
+        dtype = dtypes.pop()
+        # Float panels are stacked as float32 (values are only in [0, 1])
+        panels = np.stack(panel_images, dtype=np.float32 if dtype.kind == 'f' else dtype)
+    else:
+        panels = np.empty((4,) + img_shape, dtype=np.uint8)
+        for i, img in enumerate(panel_images):
+            panels[i] = _panel_to_uint8(img)
     
-    # print(f"Statistics meme saved to: {output_path}")
-
+    return create_statistics_meme_from_panels(
+        panels, output_path, dpi=dpi, background_color=background_color,
+        use_matplotlib=use_matplotlib, async_save=async_save, reuse_figure=reuse_figure
+    )
@@ -5,11 +5,14 @@ Generates a block letter pattern for the selection bias meme.
 
 import numpy as np
 from PIL import Image, ImageDraw, ImageFont
-from typing import Optional
+from typing import Dict, Optional, Tuple
+from collections import OrderedDict
+from functools import lru_cache
 import platform
 import os
 
 
+@lru_cache(maxsize=1)
 def _find_font_path() -> Optional[str]:
     """
     Try to find a suitable bold font path across different operating systems.
@@ -58,14 +61,111 @@ def _find_font_path() -> Optional[str]:
     return None
 
 
-def create_block_letter_s(
+@lru_cache(maxsize=32)
+def _get_font(font_path: str, font_size: int) -> ImageFont.FreeTypeFont:
+    """
+    Load a TrueType font, caching the face per (font_path, font_size).
+    
+    Parameters
+    ----------
+    font_path : str
+        Path to the font file
+    font_size : int
+        Font size in pixels
+    
+    Returns
+    -------
+    font : ImageFont.FreeTypeFont
+        The loaded font. Raises OSError if the font cannot be loaded.
+    """
+    return ImageFont.truetype(font_path, font_size)
+
+
+def _letter_metrics(font, font_size: int, letter: str) -> Tuple[float, float, float]:
+    """
+    Measure a letter for centering.
+    
+    Returns
+    -------
+    metrics : Tuple[float, float, float]
+        (text_width, text_height, bbox_y_offset) in pixels. Estimated from the
+        font size if the font is None or cannot be measured.
+    """
+    # Get text bounding box on an ephemeral 1×1 canvas
+    draw = ImageDraw.Draw(Image.new('L', (1, 1)))
+    if font:
+        try:
+            # Try newer Pillow API (8.0.0+)
+            if hasattr(draw, 'textbbox'):
+                bbox = draw.textbbox((0, 0), letter, font=font)
+                text_width = bbox[2] - bbox[0]
+                text_height = bbox[3] - bbox[1]
+                bbox_y_offset = bbox[1]
+            else:
+                # Fallback to older API (textsize)
+                text_width, text_height = draw.textsize(letter, font=font)
+                bbox_y_offset = 0
+        except (AttributeError, TypeError):
+            # Fallback: estimate size
+            text_width = font_size * len(letter) * 0.6
+            text_height = font_size
+            bbox_y_offset = 0
+    else:
+        # No font available, estimate size
+        text_width = font_size * len(letter) * 0.6
+        text_height = font_size
+        bbox_y_offset = 0
+    
+    return text_width, text_height, bbox_y_offset
+
+
+@lru_cache(maxsize=64)
+def _measure_letter(font_path: str, font_size: int, letter: str) -> Tuple[float, float, float]:
+    """
+    Cached metrics of a letter in the font at font_path; see _letter_metrics.
+    
+    Metrics never change for a fixed letter and size, so measuring once
+    spares a FreeType layout pass on every render.
+    """
+    return _letter_metrics(_get_font(font_path, font_size), font_size, letter)
+
+
+def _arc_sdf(
+    x: np.ndarray,
+    y: np.ndarray,
+    radius: float,
+    start: float,
+    span: float,
+    thickness: float
+) -> np.ndarray:
+    """
+    Signed distance to a stroked circular arc centered at the origin.
+    
+    The arc runs counterclockwise from angle start over span (radians,
+    y pointing up). Positive values lie inside the stroke.
+    """
+    angle = np.arctan2(y, x)
+    on_arc = np.mod(angle - start, 2 * np.pi) <= span
+    # Distance to the centerline where the arc covers the angle,
+    # otherwise to the nearer of the two end points
+    d_ring = np.abs(np.hypot(x, y) - radius)
+    end = start + span
+    d_start = np.hypot(x - radius * np.cos(start), y - radius * np.sin(start))
+    d_end = np.hypot(x - radius * np.cos(end), y - radius * np.sin(end))
+    d = np.where(on_arc, d_ring, np.minimum(d_start, d_end))
+    return thickness / 2 - d
+
+
+def create_block_letter_s_sdf(
     height: int,
     width: int,
-    letter: str = "S",
     font_size_ratio: float = 0.9
 ) -> np.ndarray:
     """
-    Create a block letter pattern matching the specified image dimensions.
+    Create a block letter "S" from a signed distance function, without fonts.
+    
+    The "S" is built from two stacked stroked circular arcs evaluated on a
+    NumPy grid, so no PIL/FreeType work or font files are needed.
     
     Parameters
     ----------
@@ -73,21 +173,66 @@ def create_block_letter_s(
         Height of the output image in pixels
     width : int
         Width of the output image in pixels
-    letter : str
-        Letter to render (default: "S")
     font_size_ratio : float
-        Ratio of font size to image dimension (default: 0.9).
-        Font size will be calculated as min(height, width) * font_size_ratio
+        Size of the letter relative to min(height, width), matching the
+        font size used by the FreeType renderer (default: 0.9).
     
     Returns
     -------
     letter_array : np.ndarray
-        2D numpy array (height × width) with values in [0, 1].
-        Black letter (0.0) on white background (1.0).
+        2D uint8 array (height × width) with values in {0, 255}.
+        Black letter (0) on white background (255).
     """
+    # Pixel coordinates centered on the image, y pointing up
+    y, x = np.mgrid[:height, :width].astype(np.float32)
+    x -= (width - 1) / 2
+    y = (height - 1) / 2 - y
+    
+    # Cap height of a bold font is roughly 0.75 of its size; the two arcs
+    # (radius r, stroke 0.9 r) stack to a total height of 4 r + stroke.
+    # Bowls are stretched horizontally to match the proportions of a bold "S".
+    letter_height = min(height, width) * font_size_ratio * 0.75
+    radius = letter_height / 4.9
+    thickness = 0.9 * radius
+    x /= 1.25
+    
+    # Upper bowl: from the upper-right terminal over the top and down to the
+    # center. The lower bowl is the same arc rotated by 180 degrees.
+    start, span = np.deg2rad(20.0), np.deg2rad(250.0)
+    upper = _arc_sdf(x, y - radius, radius, start, span, thickness)
+    lower = _arc_sdf(-x, -y - radius, radius, start, span, thickness)
+    sdf = np.maximum(upper, lower)
+    
+    return np.where(sdf > 0, 0, 255).astype(np.uint8)
+
+
+def _render_block_letter(
+    height: int,
+    width: int,
+    letter: str,
+    font_size_ratio: float,
+    engine: str = "freetype"
+) -> np.ndarray:
+    """
+    Rasterize a block letter (uncached; see _get_letter).
+    
+    Returns
+    -------
+    letter_array : np.ndarray
+        Read-only 2D uint8 array (height × width) with values in {0, 255}.
+        Black letter (0) on white background (255).
+    """
+    if engine == "sdf":
+        letter_array = create_block_letter_s_sdf(height, width, font_size_ratio)
+        letter_array.setflags(write=False)
+        return letter_array
+    
     # Create a white background image
     img = Image.new('L', (width, height), color=255)  # 'L' mode = grayscale, 255 = white
     draw = ImageDraw.Draw(img)
+    # Render without antialiasing: the letter is only used as a thresholded
+    # mask, so grey edge pixels are wasted work. Output is exactly 0 or 255.
+    draw.fontmode = '1'
     
     # Calculate font size based on image dimensions
     font_size = int(min(height, width) * font_size_ratio)
@@ -97,9 +242,10 @@ def create_block_letter_s(
     font_path = _find_font_path()
     if font_path:
         try:
-            font = ImageFont.truetype(font_path, font_size)
+            font = _get_font(font_path, font_size)
         except (OSError, IOError):
             font = None
+            font_path = None
     
     # If no font found, use default (may not be bold but will work)
     if font is None:
@@ -110,30 +256,11 @@ def create_block_letter_s(
             font = None
     
     # Calculate text position to center it
-    # Get text bounding box to calculate position
-    bbox = None
-    if font:
-        try:
-            # Try newer Pillow API (8.0.0+)
-            if hasattr(draw, 'textbbox'):
-                bbox = draw.textbbox((0, 0), letter, font=font)
-                text_width = bbox[2] - bbox[0]
-                text_height = bbox[3] - bbox[1]
-                bbox_y_offset = bbox[1]
-            else:
-                # Fallback to older API (textsize)
-                text_width, text_height = draw.textsize(letter, font=font)
-                bbox_y_offset = 0
-        except (AttributeError, TypeError):
-            # Fallback: estimate size
-            text_width = font_size * len(letter) * 0.6
-            text_height = font_size
-            bbox_y_offset = 0
+    # Metrics for font files are cached; the default font is measured directly
+    if font_path:
+        text_width, text_height, bbox_y_offset = _measure_letter(font_path, font_size, letter)
     else:
-        # No font available, estimate size
-        text_width = font_size * len(letter) * 0.6
-        text_height = font_size
-        bbox_y_offset = 0
+        text_width, text_height, bbox_y_offset = _letter_metrics(font, font_size, letter)
     
     # Center the text
     x = (width - text_width) / 2
@@ -145,10 +272,152 @@ def create_block_letter_s(
     else:
         draw.text((x, y), letter, fill=0)  # fill=0 = black
     
-    # Convert PIL image to numpy array and normalize to [0, 1]
+    # Convert PIL image to numpy array, keeping PIL's 8-bit values
     # PIL 'L' mode: 0=black, 255=white
-    # Normalized: 0.0=black, 1.0=white (which is what we want)
-    letter_array = np.array(img, dtype=np.float32) / 255.0
+    # frombuffer views the raw bytes directly, skipping np.array's generic
+    # conversion; the view is read-only, which suits the shared cached array
+    letter_array = np.frombuffer(img.tobytes(), dtype=np.uint8).reshape(height, width)
+    
+    return letter_array
+
+
+# Rendered letters keyed by (letter, height, width, font_size_ratio, engine),
+# evicted least-recently-used beyond _ATLAS_MAX_ENTRIES
+_LETTER_ATLAS: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+_ATLAS_MAX_ENTRIES = 128
+
+
+def _get_letter(
+    height: int,
+    width: int,
+    letter: str,
+    font_size_ratio: float,
+    engine: str = "freetype"
+) -> np.ndarray:
+    """
+    Return a rendered letter from the atlas, rendering it on a miss.
+    
+    Returns
+    -------
+    letter_array : np.ndarray
+        Read-only 2D uint8 array (height × width), as from _render_block_letter.
+    """
+    key = (letter, height, width, font_size_ratio, engine)
+    letter_array = _LETTER_ATLAS.get(key)
+    if letter_array is not None:
+        _LETTER_ATLAS.move_to_end(key)
+        return letter_array
+    
+    letter_array = _render_block_letter(height, width, letter, font_size_ratio, engine)
+    _LETTER_ATLAS[key] = letter_array
+    if len(_LETTER_ATLAS) > _ATLAS_MAX_ENTRIES:
+        _LETTER_ATLAS.popitem(last=False)
+    return letter_array
+
+
+def build_letter_atlas(
+    letters: str,
+    height: int,
+    width: int,
+    font_size_ratio: float = 0.9
+) -> Dict[str, np.ndarray]:
+    """
+    Pre-render a set of block letters for batch meme generation.
+    
+    The font is loaded once and every letter is rasterized up front, so later
+    create_block_letter_s calls with the same dimensions are atlas lookups.
+    
+    Parameters
+    ----------
+    letters : str
+        Letters to render, e.g. "ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+    height : int
+        Height of each letter image in pixels
+    width : int
+        Width of each letter image in pixels
+    font_size_ratio : float
+        Ratio of font size to image dimension (default: 0.9)
+    
+    Returns
+    -------
+    atlas : Dict[str, np.ndarray]
+        Mapping from letter to a read-only 2D uint8 array (height × width),
+        black letter (0) on white background (255).
+    """
+    return {
+        letter: _get_letter(height, width, letter, font_size_ratio)
+        for letter in dict.fromkeys(letters)
+    }
+
+
+def create_block_letter_s(
+    height: int,
+    width: int,
+    letter: str = "S",
+    font_size_ratio: float = 0.9,
+    copy: bool = True,
+    return_bool: bool = False,
+    as_float: bool = False,
+    engine: str = "freetype"
+) -> np.ndarray:
+    """
+    Create a block letter pattern matching the specified image dimensions.
+    
+    Rendered letters are kept in a letter atlas (see build_letter_atlas), so
+    repeated calls with the same arguments skip the PIL/FreeType
+    rasterization entirely.
+    
+    Parameters
+    ----------
+    height : int
+        Height of the output image in pixels
+    width : int
+        Width of the output image in pixels
+    letter : str
+        Letter to render (default: "S")
+    font_size_ratio : float
+        Ratio of font size to image dimension (default: 0.9).
+        Font size will be calculated as min(height, width) * font_size_ratio
+    copy : bool
+        If True (default), return a writable copy of the cached letter.
+        If False, return the cached array itself, which is read-only.
+        Use False when the result is only read (e.g. passed as a mask).
+        Ignored when return_bool or as_float is set (a new array is returned).
+    return_bool : bool
+        If True, return a boolean array that is True on the white background
+        and False on the letter. Default False.
+    as_float : bool
+        If True, return a float32 array with values in [0, 1] instead of uint8.
+        Default False.
+    engine : str
+        "freetype" (default) renders the letter with PIL and a system font.
+        "sdf" draws an "S" from a signed distance function in pure NumPy
+        (see create_block_letter_s_sdf); only letter="S" is supported.
+    
+    Returns
+    -------
+    letter_array : np.ndarray
+        2D numpy array (height × width). By default uint8 with values in
+        {0, 255} (the letter is rendered without antialiasing):
+        black letter (0) on white background (255).
+        See return_bool and as_float for the other output forms.
+    
+    Raises
+    ------
+    ValueError
+        If engine is unknown, or engine="sdf" is used with a letter other than "S".
+    """
+    if engine not in ("freetype", "sdf"):
+        raise ValueError(f"Unknown engine: {engine!r} (expected 'freetype' or 'sdf')")
+    if engine == "sdf" and letter != "S":
+        raise ValueError(f"engine='sdf' only supports letter='S', got {letter!r}")
     
+    letter_array = _get_letter(height, width, letter, font_size_ratio, engine)
+    if return_bool:
+        return letter_array >= 128
+    if as_float:
+        return letter_array.astype(np.float32) * np.float32(1 / 255.0)
+    if copy:
+        letter_array = letter_array.copy()
     return letter_array
 
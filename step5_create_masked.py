@@ -4,7 +4,141 @@ This demonstrates selection bias by systematically removing data points
 in the shape of the mask (block letter "S").
 """
 
+import math
+import weakref
+from collections import OrderedDict
+from typing import Optional
 import numpy as np
+from step4_create_block_letter import create_block_letter_s
+
+try:
+    from numba import njit, prange
+    _HAVE_NUMBA = True
+except ImportError:
+    _HAVE_NUMBA = False
+
+
+if _HAVE_NUMBA:
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _mask_apply(stipple, mask_area, out):
+        """Per-pixel select: out = 1.0 where mask_area, else stipple."""
+        for i in prange(stipple.shape[0]):
+            for j in range(stipple.shape[1]):
+                out[i, j] = 1.0 if mask_area[i, j] else stipple[i, j]
+
+    @njit(parallel=True, fastmath=True, cache=True)
+    def _threshold_mask_apply(stipple, mask, threshold, out):
+        """Fused per-pixel select: out = 1.0 where mask < threshold, else stipple."""
+        for i in prange(stipple.shape[0]):
+            for j in range(stipple.shape[1]):
+                out[i, j] = 1.0 if mask[i, j] < threshold else stipple[i, j]
+
+
+def _comparable_mask(mask_img: np.ndarray, threshold: float) -> tuple:
+    """
+    Express a mask and threshold so that the mask area is values < threshold.
+    
+    Returns
+    -------
+    values, threshold : tuple
+        uint8 masks are compared against ceil(threshold * 255), which for
+        integer v is equivalent to v / 255 < threshold. Boolean keep-masks are
+        viewed as uint8 and compared against 1 (False = mask area).
+    """
+    if mask_img.dtype == np.bool_:
+        return mask_img.view(np.uint8), 1
+    if mask_img.dtype == np.uint8:
+        return mask_img, math.ceil(threshold * 255)
+    if mask_img.dtype == np.float32:
+        return mask_img, np.float32(threshold)
+    return mask_img, threshold
+
+
+def _is_immutable(arr: np.ndarray) -> bool:
+    """
+    Return True if the data behind arr cannot change through another reference.
+    
+    arr and every array in its base chain must be read-only, and the chain must
+    end in memory the array owns or in an immutable bytes object (as for the
+    letter atlas). A read-only view of a writable array does not qualify.
+    """
+    while isinstance(arr, np.ndarray):
+        if arr.flags.writeable:
+            return False
+        arr = arr.base
+    return arr is None or isinstance(arr, bytes)
+
+
+# Cached mask areas keyed by (id(mask_img), normalized threshold), evicted
+# least-recently-used beyond _MASK_CACHE_MAX_ENTRIES. All entries for a mask
+# are also dropped by a weakref finalizer when the mask is garbage collected.
+_MASK_CACHE: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+_MASK_CACHE_MAX_ENTRIES = 16
+_MASK_CACHE_WATCHED = set()
+
+
+def _forget_mask(mask_id: int) -> None:
+    """
+    Drop all cached mask areas of a garbage-collected mask.
+    """
+    _MASK_CACHE_WATCHED.discard(mask_id)
+    for key in [key for key in _MASK_CACHE if key[0] == mask_id]:
+        del _MASK_CACHE[key]
+
+
+def _compute_mask_bool(
+    mask_img: np.ndarray,
+    threshold: float = 0.5,
+    immutable: Optional[bool] = None
+) -> np.ndarray:
+    """
+    Compute the boolean mask area (True = remove stipples) of a mask image.
+    
+    Results for immutable masks (e.g. create_block_letter_s(..., copy=False))
+    are cached, so parameter sweeps over the same mask pay the comparison once.
+    Other masks are recomputed on every call since they may change in place.
+    
+    Parameters
+    ----------
+    mask_img : np.ndarray
+        Mask image as accepted by create_masked_stipple (float in [0, 1],
+        uint8 in [0, 255], or boolean with True on the keep area).
+    threshold : float
+        Pixels with mask values below threshold belong to the mask area.
+        Ignored for boolean masks. Default 0.5.
+    immutable : Optional[bool]
+        Result of _is_immutable(mask_img) if the caller already has it;
+        computed here when None.
+    
+    Returns
+    -------
+    mask_area : np.ndarray
+        Read-only boolean array, True where stipples are removed.
+    """
+    if immutable is None:
+        immutable = _is_immutable(mask_img)
+    values, threshold = _comparable_mask(mask_img, threshold)
+    
+    # Thresholds that compare identically (e.g. equal ceil(t * 255) for
+    # uint8 masks) share one entry
+    key = (id(mask_img), threshold)
+    if immutable:
+        mask_area = _MASK_CACHE.get(key)
+        if mask_area is not None:
+            _MASK_CACHE.move_to_end(key)
+            return mask_area
+    
+    mask_area = values < threshold
+    mask_area.setflags(write=False)
+    
+    if immutable:
+        _MASK_CACHE[key] = mask_area
+        if len(_MASK_CACHE) > _MASK_CACHE_MAX_ENTRIES:
+            _MASK_CACHE.popitem(last=False)
+        if key[0] not in _MASK_CACHE_WATCHED:
+            _MASK_CACHE_WATCHED.add(key[0])
+            weakref.finalize(mask_img, _forget_mask, key[0])
+    return mask_area
 
 
 def create_masked_stipple(
@@ -24,20 +158,26 @@ def create_masked_stipple(
     stipple_img : np.ndarray
         Stippled image as 2D array (height, width) with values in [0, 1].
         0.0 = black dot (stipple), 1.0 = white background.
+        Processed as float32; other dtypes (e.g. float64) are cast first.
     mask_img : np.ndarray
         Mask image (block letter) as 2D array (height, width) with values in [0, 1].
         0.0 = black (mask area, remove stipples here),
         1.0 = white (keep area, preserve stipples here).
+        A uint8 mask with values in [0, 255] is also accepted, as is a boolean
+        mask that is True on the keep area and False on the mask area.
+        Float masks are processed as float32.
         Must have the same shape as stipple_img.
     threshold : float
         Threshold value that determines what counts as "part of the mask".
         Pixels with mask values below threshold are considered part of the mask
         and will have their stipples removed. Default 0.5.
+        For uint8 masks the threshold is scaled to [0, 255]; it is ignored for
+        boolean masks.
     
     Returns
     -------
     masked_stipple : np.ndarray
-        2D numpy array (height, width) with values in [0, 1].
+        2D float32 array (height, width) with values in [0, 1].
         Same shape as input images.
         Pixels where mask < threshold are set to 1.0 (white, stipples removed).
         Pixels where mask >= threshold keep their original stipple values.
@@ -55,17 +195,90 @@ def create_masked_stipple(
             f"mask_img shape: {mask_img.shape}"
         )
     
-    # Make a copy of the stippled image to avoid modifying the original
-    masked_stipple = stipple_img.copy()
+    # The work is memory-bound, so run it at 4 bytes per pixel
+    if stipple_img.dtype != np.float32:
+        stipple_img = stipple_img.astype(np.float32, copy=False)
+    if mask_img.dtype.kind == 'f' and mask_img.dtype != np.float32:
+        mask_img = mask_img.astype(np.float32, copy=False)
+    
+    # Immutable masks go through the cached boolean mask area; anything else is
+    # thresholded inside the masking pass, without a boolean temporary
+    if _is_immutable(mask_img):
+        mask_area = _compute_mask_bool(mask_img, threshold, immutable=True)
+        if _HAVE_NUMBA and stipple_img.ndim == 2:
+            stipple_img = np.ascontiguousarray(stipple_img)
+            masked_stipple = np.empty_like(stipple_img)
+            _mask_apply(stipple_img, np.ascontiguousarray(mask_area), masked_stipple)
+            return masked_stipple
+    else:
+        values, threshold = _comparable_mask(mask_img, threshold)
+        if _HAVE_NUMBA and stipple_img.ndim == 2:
+            stipple_img = np.ascontiguousarray(stipple_img)
+            masked_stipple = np.empty_like(stipple_img)
+            _threshold_mask_apply(stipple_img, np.ascontiguousarray(values), threshold,
+                                  masked_stipple)
+            return masked_stipple
+        mask_area = values < threshold
+    
+    # Allocate the output and stream the stippled image into it
+    # (avoids modifying the original)
+    masked_stipple = np.empty_like(stipple_img)
+    np.copyto(masked_stipple, stipple_img)
     
     # Apply the mask:
     # - Where mask is dark (below threshold): remove stipples by setting to 1.0 (white)
     # - Where mask is light (above threshold): keep stipples as they are
-    # The mask image has 0.0 = black (mask area) and 1.0 = white (keep area)
-    mask_area = mask_img < threshold
-    
-    # Set masked areas to white (1.0), effectively removing stipples
-    masked_stipple[mask_area] = 1.0
+    np.putmask(masked_stipple, mask_area, 1.0)
     
     return masked_stipple
 
+
+def apply_letter_mask_fused(
+    stipple_img: np.ndarray,
+    letter: str = "S",
+    font_size_ratio: float = 0.9,
+    threshold: float = 0.5
+) -> np.ndarray:
+    """
+    Render a block letter and remove the stipples under it in one step.
+    
+    Equivalent to create_masked_stipple with a create_block_letter_s mask,
+    but the letter stays an 8-bit raster (shared with the letter atlas) and is
+    thresholded inside the masking pass, so no float or boolean mask is built.
+    
+    Parameters
+    ----------
+    stipple_img : np.ndarray
+        Stippled image as 2D array (height, width) with values in [0, 1].
+        Processed as float32.
+    letter : str
+        Letter to use as the mask (default: "S")
+    font_size_ratio : float
+        Ratio of font size to image dimension (default: 0.9)
+    threshold : float
+        Pixels where the letter image is below threshold (on a [0, 1] scale)
+        have their stipples removed. Default 0.5.
+    
+    Returns
+    -------
+    masked_stipple : np.ndarray
+        2D float32 array (height, width) with values in [0, 1].
+    """
+    if stipple_img.dtype != np.float32:
+        stipple_img = stipple_img.astype(np.float32, copy=False)
+    height, width = stipple_img.shape
+    raster = create_block_letter_s(height, width, letter=letter,
+                                   font_size_ratio=font_size_ratio, copy=False)
+    
+    raster, threshold_u8 = _comparable_mask(raster, threshold)
+    
+    if _HAVE_NUMBA:
+        stipple_img = np.ascontiguousarray(stipple_img)
+        masked_stipple = np.empty_like(stipple_img)
+        _threshold_mask_apply(stipple_img, raster, threshold_u8, masked_stipple)
+        return masked_stipple
+    
+    masked_stipple = np.empty_like(stipple_img)
+    np.copyto(masked_stipple, stipple_img)
+    np.putmask(masked_stipple, raster < threshold_u8, 1.0)
+    return masked_stipple